@@ -1,10 +1,24 @@
 import os
+import uuid
 from datetime import datetime
 from typing import List, Dict, Any
 
 import streamlit as st
 
-from utils.g_sheets import append_to_google_sheet
+from utils.g_sheets import read_columns
+from utils.outbox import start_outbox, submit as submit_response
+from utils.counters import snapshot as counters_snapshot, maybe_reconcile_async
+from utils.health import start_health_monitor, get_health_status
+from utils.admission import (
+    SubmitBusyError,
+    admission_stats,
+    admit_session,
+    is_kiosk_param,
+    release_session,
+    submit_slot,
+)
+from utils.profiler import profile_run, list_profiles
+from utils.text_analysis import update_analysis, cached_summary
 
 # ----------------------------
 # Constants and Configuration
@@ -17,6 +31,8 @@ LOGO_PATH = "assets/logo.png"
 
 PAGE_TITLE = "IBA RadioPharma Solutions Quick Brand Perception survey"
 TOTAL_PAGES = 6
+STAFF_KEY = os.environ.get("STAFF_KEY", "")
+STATS_REFRESH_S = int(os.environ.get("STATS_REFRESH", "10"))
 
 # Form options
 ROLE_OPTIONS = ["", "Physician", "Medical Physicist", "Researcher", "Industry", "Radiopharmacist", "Other"]
@@ -347,6 +363,119 @@ def get_query_param(name: str, default: str = "") -> str:
         qp = st.experimental_get_query_params()
         return qp.get(name, [default])[0] if qp else default
 
+def drop_query_params(*names: str):
+    """Remove query parameters with fallback for older Streamlit versions"""
+    try:
+        for name in names:
+            if name in st.query_params:
+                del st.query_params[name]
+    except Exception:
+        qp = st.experimental_get_query_params()
+        st.experimental_set_query_params(**{k: v for k, v in qp.items() if k not in names})
+
+@st.cache_resource
+def ensure_background_workers():
+    """Start the Sheets prober and outbox flusher once per server process"""
+    start_health_monitor()
+    start_outbox()
+    return True
+
+def render_health_page():
+    """Cached readiness/liveness view for ?health=1 (no Sheets calls)"""
+    st.json({**get_health_status(), **admission_stats()})
+
+def is_kiosk_session() -> bool:
+    """Kiosk iPads open the app with ?kiosk=... and get priority under load"""
+    return is_kiosk_param(get_query_param("kiosk", ""))
+
+def is_staff_session() -> bool:
+    """Staff-only views require ?staff_key= matching the STAFF_KEY env var"""
+    return bool(STAFF_KEY) and get_query_param("staff_key", "") == STAFF_KEY
+
+def consume_profile_run() -> bool:
+    """Arm ?profile=N for staff, then return True for the next N reruns of this session"""
+    requested = get_query_param("profile", "")
+    if requested and is_staff_session():
+        st.session_state["profile_runs_left"] = int(requested) if requested.isdigit() else 0
+        # Back to a plain visitor URL so the kiosk doesn't keep showing staff-only UI
+        drop_query_params("profile", "staff_key")
+    runs_left = st.session_state.get("profile_runs_left", 0)
+    if runs_left > 0:
+        st.session_state["profile_runs_left"] = runs_left - 1
+        return True
+    return False
+
+def render_profiles_page():
+    """Staff view listing saved profiles for download"""
+    render_section_title("Saved profiles")
+    st.caption("Folded stacks: open in https://www.speedscope.app or flamegraph.pl.")
+    paths = list_profiles()
+    if not paths:
+        st.info("No profiles yet. Add ?profile=N to a kiosk URL to record the next N reruns.")
+    for i, path in enumerate(paths):
+        with open(path, "rb") as f:
+            st.download_button(os.path.basename(path), f.read(), file_name=os.path.basename(path), key=f"profile_{i}")
+
+def render_live_counts():
+    """Response counts maintained on the write path (no sheet reads)"""
+    maybe_reconcile_async(read_columns)
+    stats = counters_snapshot()
+    st.metric("Responses", stats["total"])
+    cols = st.columns(3)
+    for col, (field, title) in zip(cols, [("staff_initials", "Staff"), ("role", "Role"), ("region", "Region")]):
+        with col:
+            st.caption(title)
+            for label, count in stats["counts"].get(field, {}).items():
+                st.write(f"{label}: **{count}**")
+    if stats["reconciled_at"]:
+        synced = datetime.utcfromtimestamp(stats["reconciled_at"]).strftime("%H:%M UTC")
+        st.caption(f"Last reconciled with the sheet at {synced}.")
+
+def render_stats_page():
+    """Staff view with auto-refreshing live counts"""
+    render_section_title("Live responses")
+    fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+    if fragment is not None:
+        fragment(run_every=STATS_REFRESH_S)(render_live_counts)()
+    else:
+        render_live_counts()
+        st.caption("Reload the page to refresh.")
+
+def render_insights_page():
+    """Staff view of term frequencies and near-duplicate clusters in free-text answers"""
+    render_section_title("Free-text insights")
+    if st.button("Process new responses"):
+        result = update_analysis(read_columns)
+        st.caption(f"Processed {result['new_rows']} new rows in {result['seconds']}s.")
+        summary = result
+    else:
+        summary = cached_summary()
+    for field, title in [("improve_one_thing", "One thing to improve"), ("current_problem", "Current problem")]:
+        data = summary["fields"][field]
+        st.markdown(f"**{title}** ({data['docs']} answers)")
+        st.write(", ".join(f"{term} ({count})" for term, count in data["top_terms"]) or "No answers yet.")
+        for cluster in data["clusters"]:
+            with st.expander(f"{cluster['size']}× {cluster['examples'][0][:80]}"):
+                for example in cluster["examples"]:
+                    st.write(f"- {example}")
+
+def render_submit_mode_indicator():
+    """Small staff-only line showing how submissions are currently written"""
+    stats = get_health_status()
+    latency = stats["sheets_latency_ms"]
+    latency_text = f"{latency:.0f} ms" if latency is not None else "n/a"
+    st.caption(
+        f"Submit mode: **{stats['submit_mode']}** · Sheets {latency_text}, "
+        f"{stats['sheets_error_rate']:.0%} errors · outbox {stats['outbox_backlog'] or 0}"
+    )
+    if stats["outbox_last_error"]:
+        st.caption(f"Outbox flush failing: {stats['outbox_last_error']}")
+
+def render_waiting_page():
+    """Lightweight overflow page shown when the app is at capacity"""
+    st.info("Lots of visitors right now! Please wait a moment and tap below to start the survey.")
+    st.button("Try again ↻")
+
 def init_session_state():
     """Initialize session state with default values"""
     defaults = {
@@ -355,6 +484,8 @@ def init_session_state():
         "submitted": False,
         "error_msg": "",
         "brand_rank_order": None,
+        "session_id": uuid.uuid4().hex,
+        "admitted": False,
     }
     for key, value in defaults.items():
         if key not in st.session_state:
@@ -455,9 +586,14 @@ def submit_survey_data():
             answers[key] = ", ".join(answers[key])
     
     try:
-        append_to_google_sheet(answers)
+        with submit_slot(is_kiosk_session()):
+            submit_response(answers)
         st.session_state.submitted = True
+        if not is_kiosk_session():
+            release_session(st.session_state.session_id)
         navigate(+1)
+    except SubmitBusyError as e:
+        st.warning(str(e))
     except Exception as e:
         st.error(f"Submission failed: {e}")
         st.info("Please check your internet connection and try again.")
@@ -661,6 +797,7 @@ def render_thank_you_page():
             "submitted": False,
             "error_msg": "",
             "brand_rank_order": None,
+            "admitted": False,
         })
         st.rerun()
     
@@ -669,12 +806,33 @@ def render_thank_you_page():
 # ----------------------------
 # Main Application
 # ----------------------------
-def main():
-    """Main application function"""
-    # Initialize
-    init_session_state()
+def run_app():
+    """Render one rerun of the app"""
+    ensure_background_workers()
+    if get_query_param("health", ""):
+        render_health_page()
+        return
+    if is_staff_session() and get_query_param("profiles", ""):
+        render_profiles_page()
+        return
+    if is_staff_session() and get_query_param("stats", ""):
+        render_stats_page()
+        return
+    if is_staff_session() and get_query_param("insights", ""):
+        render_insights_page()
+        return
+
+    if not st.session_state.submitted:
+        # Once admitted, idle expiry must not bounce a visitor mid-survey and lose their page
+        if not admit_session(st.session_state.session_id, is_kiosk_session(), st.session_state.admitted):
+            render_waiting_page()
+            return
+        st.session_state.admitted = True
+
     apply_custom_styles()
     render_header()
+    if is_staff_session():
+        render_submit_mode_indicator()
     
     # Handle staff initials from URL
     staff_initials = get_query_param("staff", "")
@@ -701,5 +859,14 @@ def main():
     else:
         render_thank_you_page()
 
+def main():
+    """Main application function"""
+    init_session_state()
+    if consume_profile_run():
+        with profile_run(st.session_state.session_id, st.session_state.page):
+            run_app()
+    else:
+        run_app()
+
 if __name__ == "__main__":
     main()
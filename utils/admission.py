@@ -0,0 +1,98 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Tuple
+
+# Limits are per server process; 0 disables the corresponding limit
+MAX_ACTIVE_SESSIONS = int(os.environ.get("MAX_ACTIVE_SESSIONS", "0"))
+MAX_INFLIGHT_SUBMITS = int(os.environ.get("MAX_INFLIGHT_SUBMITS", "0"))
+KIOSK_RESERVED_SUBMITS = int(os.environ.get("KIOSK_RESERVED_SUBMITS", "1"))
+SESSION_IDLE_TIMEOUT_S = float(os.environ.get("SESSION_IDLE_TIMEOUT", "300"))
+SUBMIT_WAIT_S = float(os.environ.get("SUBMIT_WAIT", "5"))
+KIOSK_KEY = os.environ.get("KIOSK_KEY", "")
+
+if 0 < MAX_INFLIGHT_SUBMITS <= KIOSK_RESERVED_SUBMITS:
+    raise RuntimeError(
+        "MAX_INFLIGHT_SUBMITS must be greater than KIOSK_RESERVED_SUBMITS (or 0 to disable the limit)."
+    )
+
+_cond = threading.Condition()
+_sessions: Dict[str, Tuple[float, bool]] = {}  # session_id -> (last_seen, is_kiosk)
+_inflight_submits = 0
+
+
+class SubmitBusyError(RuntimeError):
+    pass
+
+
+def is_kiosk_param(value: str) -> bool:
+    # With KIOSK_KEY set, ?kiosk= must match it so phones can't claim priority
+    if not value:
+        return False
+    return not KIOSK_KEY or value == KIOSK_KEY
+
+
+def _expire_idle(now: float) -> None:
+    stale = [sid for sid, (seen, _) in _sessions.items() if now - seen > SESSION_IDLE_TIMEOUT_S]
+    for sid in stale:
+        del _sessions[sid]
+
+
+def admit_session(session_id: str, is_kiosk: bool, started: bool = False) -> bool:
+    """Admit or refresh a session; kiosks and sessions already admitted once are never turned away"""
+    now = time.time()
+    with _cond:
+        _expire_idle(now)
+        walk_ups = sum(1 for _, kiosk in _sessions.values() if not kiosk)
+        admitted = (
+            started
+            or session_id in _sessions
+            or is_kiosk
+            or MAX_ACTIVE_SESSIONS <= 0
+            or walk_ups < MAX_ACTIVE_SESSIONS
+        )
+        if admitted:
+            _sessions[session_id] = (now, is_kiosk)
+        return admitted
+
+
+def release_session(session_id: str) -> None:
+    with _cond:
+        _sessions.pop(session_id, None)
+
+
+@contextmanager
+def submit_slot(is_kiosk: bool):
+    """Bound concurrent Sheets writes; the last KIOSK_RESERVED_SUBMITS slots are kiosk-only"""
+    global _inflight_submits
+    if MAX_INFLIGHT_SUBMITS <= 0:
+        yield
+        return
+
+    limit = MAX_INFLIGHT_SUBMITS if is_kiosk else MAX_INFLIGHT_SUBMITS - KIOSK_RESERVED_SUBMITS
+    deadline = time.monotonic() + SUBMIT_WAIT_S
+    with _cond:
+        while _inflight_submits >= limit:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise SubmitBusyError("The survey is busy right now. Please try again in a few seconds.")
+            _cond.wait(remaining)
+        _inflight_submits += 1
+    try:
+        yield
+    finally:
+        with _cond:
+            _inflight_submits -= 1
+            _cond.notify_all()
+
+
+def admission_stats() -> Dict[str, Any]:
+    with _cond:
+        _expire_idle(time.time())
+        kiosks = sum(1 for _, is_kiosk in _sessions.values() if is_kiosk)
+        return {
+            "active_sessions": len(_sessions),
+            "kiosk_sessions": kiosks,
+            "inflight_submits": _inflight_submits,
+        }
@@ -0,0 +1,135 @@
+import json
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+# Live response counts maintained on the write path; no sheet reads on refresh
+COUNTED_FIELDS: List[str] = ["staff_initials", "role", "region"]
+COUNTERS_PATH = os.environ.get("COUNTERS_PATH", ".live_counters.json")
+RECONCILE_INTERVAL_S = float(os.environ.get("COUNTERS_RECONCILE_INTERVAL", "3600"))
+RECONCILE_RETRY_S = 300.0
+EMPTY_LABEL = "(none)"
+
+_lock = threading.Lock()
+_total = 0
+_counts: Dict[str, Counter] = {field: Counter() for field in COUNTED_FIELDS}
+_reconciled_at: Optional[float] = None
+_reconcile_running = False
+_reconcile_attempted_at: Optional[float] = None
+# Responses recorded while a recount is in flight, as (sheet row or None, labels)
+_reconcile_delta: Optional[List[Tuple[Optional[int], Dict[str, str]]]] = None
+
+
+def _label(value: Any) -> str:
+    value = str(value).strip() if value is not None else ""
+    return value or EMPTY_LABEL
+
+
+def _save_locked() -> None:
+    data = {
+        "total": _total,
+        "counts": {field: dict(c) for field, c in _counts.items()},
+        "reconciled_at": _reconciled_at,
+    }
+    tmp_path = COUNTERS_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, COUNTERS_PATH)
+
+
+def _load() -> None:
+    global _total, _reconciled_at
+    try:
+        with open(COUNTERS_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return
+    _total = int(data.get("total", 0))
+    _reconciled_at = data.get("reconciled_at")
+    for field in COUNTED_FIELDS:
+        _counts[field] = Counter(data.get("counts", {}).get(field, {}))
+
+
+def record_response(payload: Dict[str, Any], row: Optional[int] = None) -> None:
+    """O(1) update after a successful append; row is the sheet row it landed in, if known"""
+    global _total
+    labels = {field: _label(payload.get(field)) for field in COUNTED_FIELDS}
+    with _lock:
+        _total += 1
+        for field, label in labels.items():
+            _counts[field][label] += 1
+        if _reconcile_delta is not None:
+            _reconcile_delta.append((row, labels))
+        try:
+            _save_locked()
+        except OSError:
+            pass  # counts stay correct in memory; next save or reconcile catches up
+
+
+def snapshot() -> Dict[str, Any]:
+    with _lock:
+        return {
+            "total": _total,
+            "counts": {field: dict(c.most_common()) for field, c in _counts.items()},
+            "reconciled_at": _reconciled_at,
+        }
+
+
+def reconcile(read_columns: Callable[[List[str]], Dict[str, List[str]]]) -> None:
+    """Replace the counts with a recount from the sheet (a single batched read)"""
+    global _total, _reconciled_at, _reconcile_delta
+    with _lock:
+        _reconcile_delta = []
+    try:
+        columns = read_columns(COUNTED_FIELDS)
+        total = max((len(v) for v in columns.values()), default=0)
+        counts = {}
+        for field in COUNTED_FIELDS:
+            values = columns.get(field, [])
+            values = values + [""] * (total - len(values))  # trailing blanks are trimmed by the API
+            counts[field] = Counter(_label(v) for v in values)
+        last_row_read = total + 1  # data starts on row 2
+        with _lock:
+            # Add back only writes that landed below what the read saw
+            for row, labels in _reconcile_delta:
+                if row is None or row > last_row_read:
+                    total += 1
+                    for field, label in labels.items():
+                        counts[field][label] += 1
+            _total = total
+            _counts.update(counts)
+            _reconciled_at = time.time()
+            _save_locked()
+    finally:
+        with _lock:
+            _reconcile_delta = None
+
+
+def maybe_reconcile_async(read_columns: Callable[[List[str]], Dict[str, List[str]]]) -> None:
+    """Kick off a background reconcile if the last one is older than RECONCILE_INTERVAL_S"""
+    global _reconcile_running, _reconcile_attempted_at
+    now = time.time()
+    with _lock:
+        due = _reconciled_at is None or now - _reconciled_at > RECONCILE_INTERVAL_S
+        retry_wait = _reconcile_attempted_at is not None and now - _reconcile_attempted_at < RECONCILE_RETRY_S
+        if not due or retry_wait or _reconcile_running:
+            return
+        _reconcile_running = True
+        _reconcile_attempted_at = now
+
+    def _run():
+        global _reconcile_running
+        try:
+            reconcile(read_columns)
+        except Exception:
+            pass  # keep serving write-path counts; retried on the next due check
+        finally:
+            with _lock:
+                _reconcile_running = False
+
+    threading.Thread(target=_run, name="counters-reconcile", daemon=True).start()
+
+
+_load()
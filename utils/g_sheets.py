@@ -1,10 +1,17 @@
 from functools import lru_cache
 import os
-from typing import Tuple, Dict, Any, List
+import re
+import time
+from typing import Tuple, Dict, Any, List, Optional
 
 import gspread
+import requests
+from google.auth.exceptions import TransportError
 from google.oauth2.service_account import Credentials
 
+from utils.counters import record_response
+from utils.link_monitor import record_sample
+
 SCOPE = [
     "https://www.googleapis.com/auth/spreadsheets",
     "https://www.googleapis.com/auth/drive",
@@ -32,7 +39,11 @@ HEADERS: List[str] = [
     "staff_initials",
 ]
 
+# Per-request HTTP timeout; a stalled call on bad Wi-Fi fails fast and the outbox takes the row
+SHEETS_TIMEOUT_S = float(os.environ.get("SHEETS_TIMEOUT", "5"))
+
 _headers_initialized = False  # module-level guard
+_last_write_ok_at: Optional[float] = None  # time.time() of the last successful append
 
 
 def _read_sheet_config():
@@ -64,7 +75,9 @@ def _read_sheet_config():
 def _get_client() -> gspread.Client:
     sheet_name, worksheet, sa_info = _read_sheet_config()
     creds = Credentials.from_service_account_info(sa_info, scopes=SCOPE)
-    return gspread.authorize(creds)
+    client = gspread.authorize(creds)
+    client.set_timeout(SHEETS_TIMEOUT_S)
+    return client
 
 
 @lru_cache(maxsize=8)
@@ -89,11 +102,7 @@ def _ensure_headers(ws) -> None:
     _headers_initialized = True
 
 
-def append_to_google_sheet(payload: Dict[str, Any]) -> None:
-    sheet_name, worksheet, _ = _read_sheet_config()
-    ws = _get_worksheet(sheet_name, worksheet)
-    _ensure_headers(ws)
-
+def _build_row(payload: Dict[str, Any]) -> List[Any]:
     # Build row in fixed order; flatten lists to comma-separated strings.
     row = []
     for key in HEADERS:
@@ -101,14 +110,125 @@ def append_to_google_sheet(payload: Dict[str, Any]) -> None:
         if isinstance(val, list):
             val = ", ".join(val)
         row.append(val)
-    ws.append_row(row, value_input_option="USER_ENTERED")
+    return row
+
+
+def _first_updated_row(response: Any) -> Optional[int]:
+    # values.append reports where the rows landed, e.g. "Responses!A12:R14"
+    try:
+        match = re.search(r"![A-Z]+(\d+)", response["updates"]["updatedRange"])
+    except (KeyError, TypeError):
+        return None
+    return int(match.group(1)) if match else None
+
+
+def append_rows_to_google_sheet(payloads: List[Dict[str, Any]]) -> None:
+    # Single append call for all payloads; timed so the link monitor sees real write latency
+    global _last_write_ok_at
+    if not payloads:
+        return
+    started = time.perf_counter()
+    try:
+        sheet_name, worksheet, _ = _read_sheet_config()
+        ws = _get_worksheet(sheet_name, worksheet)
+        _ensure_headers(ws)
+        rows = [_build_row(p) for p in payloads]
+        started = time.perf_counter()  # one-off auth/header setup shouldn't count as link latency
+        response = ws.append_rows(rows, value_input_option="USER_ENTERED")
+    except Exception as e:
+        # Only link trouble lowers the estimate; config errors must not push writes into the spool
+        if is_transient_error(e):
+            record_sample((time.perf_counter() - started) * 1000, ok=False)
+        raise
+    record_sample((time.perf_counter() - started) * 1000, ok=True)
+    _last_write_ok_at = time.time()
+    first_row = _first_updated_row(response)
+    for i, payload in enumerate(payloads):
+        record_response(payload, row=first_row + i if first_row is not None else None)
+
+
+def append_to_google_sheet(payload: Dict[str, Any]) -> None:
+    append_rows_to_google_sheet([payload])
+
+
+def _column_letter(index: int) -> str:
+    # 0-based column index -> A1 letter(s)
+    letters = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(ord("A") + rem) + letters
+    return letters
 
 
-def healthcheck_google_sheet() -> Tuple[bool, str]:
+def _row_count(ws, needed: int) -> int:
+    # ws.row_count is from when the cached handle was opened and appends grow the grid,
+    # so only re-fetch the sheet properties when the cached count looks too small
+    if needed <= ws.row_count:
+        return ws.row_count
+    return _get_client().open_by_key(ws.spreadsheet_id).worksheet(ws.title).row_count
+
+
+def read_columns(keys: List[str], start_row: int = 2) -> Dict[str, List[str]]:
+    # One batched values read for several columns from start_row down (row 1 is the header)
+    sheet_name, worksheet, _ = _read_sheet_config()
+    ws = _get_worksheet(sheet_name, worksheet)
+    # A range starting past the grid is rejected by the API; nothing new means empty columns
+    if start_row > _row_count(ws, start_row):
+        return {key: [] for key in keys}
+    ranges = []
+    for key in keys:
+        col = _column_letter(HEADERS.index(key))
+        ranges.append(f"{col}{start_row}:{col}")
+    results = ws.batch_get(ranges)
+    return {key: [row[0] if row else "" for row in values] for key, values in zip(keys, results)}
+
+
+def blank_column_cells(key: str, row_numbers: List[int]) -> None:
+    # Blank one column in the given rows with a single values batchUpdate; consecutive rows are merged
+    if not row_numbers:
+        return
+    sheet_name, worksheet, _ = _read_sheet_config()
+    ws = _get_worksheet(sheet_name, worksheet)
+    col = _column_letter(HEADERS.index(key))
+    rows = sorted(set(row_numbers))
+    data = []
+    run_start = prev = rows[0]
+    for row in rows[1:] + [None]:
+        if row is not None and row == prev + 1:
+            prev = row
+            continue
+        data.append({"range": f"{col}{run_start}:{col}{prev}", "values": [[""]] * (prev - run_start + 1)})
+        if row is not None:
+            run_start = prev = row
+    ws.batch_update(data, value_input_option="RAW")
+
+
+def last_write_age_seconds() -> Optional[float]:
+    if _last_write_ok_at is None:
+        return None
+    return time.time() - _last_write_ok_at
+
+
+def is_transient_error(exc: Exception) -> bool:
+    # Worth retrying later: rate limits, server errors, network/timeouts. Config and
+    # permission problems (bad credentials, unknown sheet, 403/404) are not.
+    if isinstance(exc, gspread.exceptions.APIError):
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+        return status == 429 or (status is not None and status >= 500)
+    return isinstance(exc, (requests.exceptions.RequestException, TransportError, OSError))
+
+
+def healthcheck_google_sheet(deep: bool = False) -> Tuple[bool, str, bool]:
+    # Returns (ok, message, transient); deep=True makes one real (cheap) API read
+    # instead of trusting the cached handle
     try:
         sheet_name, worksheet, _ = _read_sheet_config()
         ws = _get_worksheet(sheet_name, worksheet)
-        _ = ws.title
-        return True, "ok"
+        if deep:
+            ws.row_values(1)
+        else:
+            _ = ws.title
+        return True, "ok", False
     except Exception as e:
-        return False, str(e)
+        return False, str(e), is_transient_error(e)
@@ -0,0 +1,141 @@
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Callable, Optional
+
+from utils.g_sheets import healthcheck_google_sheet, last_write_age_seconds
+from utils.link_monitor import record_sample, link_stats
+
+# Probe cadence and staleness; readiness flips to false if the last probe is older than this
+PROBE_INTERVAL_S = float(os.environ.get("HEALTH_PROBE_INTERVAL", "30"))
+STALE_AFTER_S = PROBE_INTERVAL_S * 3
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_status: Dict[str, Any] = {
+    "sheets_ok": None,
+    "sheets_error_transient": None,
+    "message": "not probed yet",
+    "probe_latency_ms": None,
+    "probed_at": None,
+}
+_outbox_source: Optional[Callable[[], Dict[str, Any]]] = None
+_prober: Optional[threading.Thread] = None
+_server: Optional[ThreadingHTTPServer] = None
+
+
+def set_outbox_source(fn: Callable[[], Dict[str, Any]]) -> None:
+    # A pending-write queue reports its backlog and last error here
+    global _outbox_source
+    _outbox_source = fn
+
+
+def probe_once() -> None:
+    healthcheck_google_sheet()  # warm the cached client so only the API read is timed
+    started = time.perf_counter()
+    ok, msg, transient = healthcheck_google_sheet(deep=True)
+    latency_ms = (time.perf_counter() - started) * 1000
+    if ok or transient:
+        record_sample(latency_ms, ok)
+    with _lock:
+        _status.update({
+            "sheets_ok": ok,
+            "sheets_error_transient": None if ok else transient,
+            "message": msg,
+            "probe_latency_ms": round(latency_ms, 1),
+            "probed_at": time.time(),
+        })
+
+
+def _probe_loop() -> None:
+    while True:
+        try:
+            probe_once()
+        except Exception as e:
+            with _lock:
+                _status.update({
+                    "sheets_ok": False,
+                    "sheets_error_transient": None,
+                    "message": str(e),
+                    "probed_at": time.time(),
+                })
+        time.sleep(PROBE_INTERVAL_S)
+
+
+def permanent_sheets_error() -> Optional[str]:
+    """Message of the last probe failure if it was a config/permission error, else None"""
+    with _lock:
+        if _status["sheets_ok"] is False and _status["sheets_error_transient"] is False:
+            return _status["message"]
+    return None
+
+
+def get_health_status() -> Dict[str, Any]:
+    """Return the cached status; never touches the Sheets API"""
+    with _lock:
+        status = dict(_status)
+    now = time.time()
+    probed_at = status.pop("probed_at")
+    status["probe_age_s"] = round(now - probed_at, 1) if probed_at else None
+    age = last_write_age_seconds()
+    status["last_write_age_s"] = round(age, 1) if age is not None else None
+    status.update({"outbox_backlog": None, "outbox_last_error": None, "outbox_last_error_age_s": None})
+    try:
+        if _outbox_source:
+            status.update(_outbox_source())
+    except Exception:
+        pass
+    status.update(link_stats())
+    status["live"] = _prober is not None and _prober.is_alive()
+    status["ready"] = bool(
+        status["live"]
+        and status["sheets_ok"]
+        and status["probe_age_s"] is not None
+        and status["probe_age_s"] <= STALE_AFTER_S
+    )
+    return status
+
+
+class _HealthHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        status = get_health_status()
+        if self.path.startswith("/healthz"):
+            code = 200 if status["live"] else 503
+        elif self.path.startswith("/readyz"):
+            code = 200 if status["ready"] else 503
+        else:
+            self.send_error(404)
+            return
+        body = json.dumps(status).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep frequent polls out of the Streamlit log
+        pass
+
+
+def start_health_monitor() -> None:
+    """Start the background prober and, if HEALTH_PORT is set, the /healthz + /readyz server"""
+    global _prober, _server
+    if _prober is None or not _prober.is_alive():
+        _prober = threading.Thread(target=_probe_loop, name="sheets-health-probe", daemon=True)
+        _prober.start()
+
+    port = os.environ.get("HEALTH_PORT")
+    if port and _server is None:
+        try:
+            _server = ThreadingHTTPServer(("0.0.0.0", int(port)), _HealthHandler)
+        except (OSError, ValueError):
+            # A busy or bad port must not take the survey down; ?health=1 still works
+            logger.exception("Could not start health endpoint on HEALTH_PORT=%r", port)
+            return
+        threading.Thread(target=_server.serve_forever, name="health-http", daemon=True).start()
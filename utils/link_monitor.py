@@ -0,0 +1,85 @@
+import threading
+import time
+from typing import Dict, Any, Optional
+
+# Rolling estimate of Sheets API latency/error rate and the submit mode it implies
+MODE_DIRECT = "direct"    # synchronous append per submit
+MODE_BATCHED = "batched"  # spool locally, background flusher appends in batches
+MODE_SPOOL = "spool"      # spool locally only, wait for the link to recover
+
+EWMA_ALPHA = 0.2
+MIN_DWELL_S = 30.0  # minimum time in a degraded mode before stepping back up
+
+# (latency_ms, error_rate) limits; recovery limits are stricter than degrade limits (hysteresis)
+DIRECT_DEGRADE = (1500.0, 0.10)
+DIRECT_RECOVER = (800.0, 0.02)
+SPOOL_DEGRADE = (5000.0, 0.50)
+SPOOL_RECOVER = (3000.0, 0.20)
+
+_lock = threading.Lock()
+_latency_ms: Optional[float] = None
+_error_rate = 0.0
+_samples = 0
+_mode = MODE_DIRECT
+_mode_since = time.time()
+
+
+def _ewma(old: Optional[float], new: float) -> float:
+    return new if old is None else old + EWMA_ALPHA * (new - old)
+
+
+def _exceeds(limits, latency_ms: float, error_rate: float) -> bool:
+    return latency_ms > limits[0] or error_rate > limits[1]
+
+
+def _within(limits, latency_ms: float, error_rate: float) -> bool:
+    return latency_ms < limits[0] and error_rate < limits[1]
+
+
+def _next_mode(now: float) -> str:
+    latency = _latency_ms or 0.0
+    dwelled = now - _mode_since >= MIN_DWELL_S
+    if _mode == MODE_DIRECT:
+        if _exceeds(SPOOL_DEGRADE, latency, _error_rate):
+            return MODE_SPOOL
+        if _exceeds(DIRECT_DEGRADE, latency, _error_rate):
+            return MODE_BATCHED
+    elif _mode == MODE_BATCHED:
+        if _exceeds(SPOOL_DEGRADE, latency, _error_rate):
+            return MODE_SPOOL
+        if dwelled and _within(DIRECT_RECOVER, latency, _error_rate):
+            return MODE_DIRECT
+    elif _mode == MODE_SPOOL:
+        if dwelled and _within(SPOOL_RECOVER, latency, _error_rate):
+            return MODE_BATCHED
+    return _mode
+
+
+def record_sample(latency_ms: float, ok: bool) -> None:
+    """Feed one timed Sheets call (real write or probe) into the estimate"""
+    global _latency_ms, _error_rate, _samples, _mode, _mode_since
+    with _lock:
+        if ok:
+            _latency_ms = _ewma(_latency_ms, latency_ms)
+        _error_rate = _ewma(_error_rate, 0.0 if ok else 1.0)
+        _samples += 1
+        now = time.time()
+        mode = _next_mode(now)
+        if mode != _mode:
+            _mode, _mode_since = mode, now
+
+
+def current_mode() -> str:
+    with _lock:
+        return _mode
+
+
+def link_stats() -> Dict[str, Any]:
+    with _lock:
+        return {
+            "submit_mode": _mode,
+            "submit_mode_age_s": round(time.time() - _mode_since, 1),
+            "sheets_latency_ms": round(_latency_ms, 1) if _latency_ms is not None else None,
+            "sheets_error_rate": round(_error_rate, 3),
+            "link_samples": _samples,
+        }
@@ -0,0 +1,166 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+from utils.g_sheets import append_rows_to_google_sheet, is_transient_error
+from utils.health import permanent_sheets_error, set_outbox_source
+from utils.link_monitor import MODE_DIRECT, MODE_SPOOL, current_mode
+
+# Durable local spool for submissions that aren't written to Sheets synchronously.
+# Delivery is at-least-once: a crash between an append and the spool rewrite can duplicate a batch.
+OUTBOX_PATH = os.environ.get("OUTBOX_PATH", ".outbox.jsonl")
+FLUSH_INTERVAL_S = float(os.environ.get("OUTBOX_FLUSH_INTERVAL", "2"))
+FLUSH_BATCH_MAX = int(os.environ.get("OUTBOX_BATCH_MAX", "200"))
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_pending: List[Dict[str, Any]] = []
+_flusher: Optional[threading.Thread] = None
+_rewrite_needed = False  # file still holds rows already appended to the sheet
+_last_error: Optional[str] = None
+_last_error_at: Optional[float] = None
+
+
+def _load() -> None:
+    # Never raises: a torn line (crash mid-enqueue) is moved aside and the rest still loads
+    global _rewrite_needed
+    corrupt: List[str] = []
+    try:
+        with open(OUTBOX_PATH, "rb") as f:
+            for raw in f:
+                raw = raw.strip()
+                if not raw:
+                    continue
+                try:
+                    payload = json.loads(raw.decode("utf-8"))
+                except ValueError:  # includes UnicodeDecodeError
+                    payload = None
+                if isinstance(payload, dict):
+                    _pending.append(payload)
+                else:
+                    corrupt.append(raw.decode("utf-8", errors="replace"))
+    except OSError:
+        return
+    if not corrupt:
+        return
+    logger.error("Moved %d unreadable outbox line(s) to %s.corrupt", len(corrupt), OUTBOX_PATH)
+    try:
+        with open(OUTBOX_PATH + ".corrupt", "a", encoding="utf-8") as f:
+            for line in corrupt:
+                f.write(line + "\n")
+    except OSError:
+        logger.exception("Could not save corrupt outbox lines")
+    # Drop the torn line from the spool so the next append doesn't land on it
+    _rewrite_needed = True
+    _retry_rewrite_locked()
+
+
+def _rewrite_locked() -> None:
+    tmp_path = OUTBOX_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for payload in _pending:
+            f.write(json.dumps(payload) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, OUTBOX_PATH)
+
+
+def _retry_rewrite_locked() -> None:
+    global _rewrite_needed
+    if not _rewrite_needed:
+        return
+    try:
+        _rewrite_locked()
+        _rewrite_needed = False
+    except OSError:
+        logger.exception("Could not rewrite %s; will retry", OUTBOX_PATH)
+
+
+def enqueue(payload: Dict[str, Any]) -> None:
+    with _lock:
+        _retry_rewrite_locked()
+        with open(OUTBOX_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(payload) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        _pending.append(payload)
+
+
+def outbox_status() -> Dict[str, Any]:
+    with _lock:
+        return {
+            "outbox_backlog": len(_pending),
+            "outbox_last_error": _last_error,
+            "outbox_last_error_age_s": round(time.time() - _last_error_at, 1) if _last_error_at else None,
+        }
+
+
+def flush_once() -> int:
+    """Append up to FLUSH_BATCH_MAX spooled rows in one call; returns rows written"""
+    global _rewrite_needed
+    with _lock:
+        batch = list(_pending[:FLUSH_BATCH_MAX])
+    if not batch:
+        return 0
+    append_rows_to_google_sheet(batch)
+    with _lock:
+        # These rows are in the sheet now, so memory drops them even if the file rewrite
+        # fails; the rewrite is then retried before the next flush or enqueue.
+        del _pending[:len(batch)]  # only the flusher removes, so the head is still this batch
+        _rewrite_needed = True
+        _retry_rewrite_locked()
+    return len(batch)
+
+
+def _flush_loop() -> None:
+    global _last_error, _last_error_at
+    while True:
+        time.sleep(FLUSH_INTERVAL_S)
+        with _lock:
+            _retry_rewrite_locked()
+        if current_mode() == MODE_SPOOL:
+            continue  # probes decide when the link is good enough to drain again
+        try:
+            if flush_once():
+                with _lock:
+                    _last_error, _last_error_at = None, None
+        except Exception as e:
+            # Rows stay spooled; surfaced in get_health_status() so staff can see a stuck outbox
+            with _lock:
+                _last_error, _last_error_at = f"{type(e).__name__}: {e}", time.time()
+            if not is_transient_error(e):
+                logger.exception("Outbox flush failed with a non-transient error")
+
+
+def submit(payload: Dict[str, Any]) -> None:
+    """Write or spool one submission according to the current link mode"""
+    config_error = permanent_sheets_error()
+    if config_error:
+        # Spooling can't fix a broken config; tell the visitor instead of a false "recorded"
+        raise RuntimeError(f"Google Sheets is not reachable with the current configuration: {config_error}")
+    if current_mode() == MODE_DIRECT:
+        try:
+            append_rows_to_google_sheet([payload])
+            return
+        except Exception as e:
+            # Config/permission errors must reach the visitor, not pile up in a local file
+            if not is_transient_error(e):
+                raise
+    enqueue(payload)
+
+
+def start_outbox() -> None:
+    """Load the spool from disk and start the background flusher"""
+    global _flusher
+    if _flusher is not None and _flusher.is_alive():
+        return
+    with _lock:
+        if not _pending:
+            _load()
+    set_outbox_source(outbox_status)
+    _flusher = threading.Thread(target=_flush_loop, name="outbox-flusher", daemon=True)
+    _flusher.start()
@@ -0,0 +1,74 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import List, Optional
+
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+SAMPLE_INTERVAL_S = float(os.environ.get("PROFILE_SAMPLE_INTERVAL", "0.005"))
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a timer and aggregates folded stacks"""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL_S):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.stacks
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            frames: List[str] = []
+            while frame is not None:
+                code = frame.f_code
+                name = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                frames.append(name.replace(";", ":"))
+                frame = frame.f_back
+            if frames:
+                self.stacks[";".join(reversed(frames))] += 1
+
+
+def write_folded(stacks: Counter, path: str) -> None:
+    # Brendan Gregg's folded format; opens in speedscope and flamegraph.pl as-is
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+@contextmanager
+def profile_run(session_id: str, page: int):
+    """Sample the calling thread for the duration of the block and save a .folded file"""
+    sampler = StackSampler(threading.get_ident())
+    sampler.start()
+    try:
+        yield
+    finally:
+        # Runs even when st.rerun() aborts the script mid-way
+        stacks = sampler.stop()
+        if stacks:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            stamp = time.strftime("%Y%m%dT%H%M%S")
+            filename = f"{stamp}_{int(time.time() * 1000) % 1000:03d}_page{page}_{session_id}.folded"
+            write_folded(stacks, os.path.join(PROFILE_DIR, filename))
+
+
+def list_profiles() -> List[str]:
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    files = [f for f in os.listdir(PROFILE_DIR) if f.endswith(".folded")]
+    return [os.path.join(PROFILE_DIR, f) for f in sorted(files, reverse=True)]
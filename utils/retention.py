@@ -0,0 +1,129 @@
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+from utils.g_sheets import read_columns, blank_column_cells
+
+# Email retention purge: one batched read of the columns it needs, one batchUpdate per chunk of rows.
+# Rows before the checkpoint hold no email left to purge, so later runs only scan the retention window.
+# The checkpoint also stores the timestamp_utc of the row just above it; if that row no longer matches
+# (sheet cleared, trimmed or re-sorted) the purge rescans from row 2 rather than skip emails.
+RETENTION_DAYS = int(os.environ.get("EMAIL_RETENTION_DAYS", "180"))
+CHECKPOINT_PATH = os.environ.get("RETENTION_CHECKPOINT_PATH", ".retention_checkpoint.json")
+CHUNK_ROWS = 5000
+
+PURGE_COLUMNS: List[str] = ["timestamp_utc", "email", "do_not_contact"]
+
+
+def _parse_timestamp(value: str) -> Optional[datetime]:
+    try:
+        ts = datetime.fromisoformat(value.strip())
+    except ValueError:
+        return None
+    return ts.replace(tzinfo=None)
+
+
+def _is_truthy(value: str) -> bool:
+    return value.strip().upper() in ("TRUE", "1", "YES")
+
+
+def _load_checkpoint() -> Tuple[int, str]:
+    try:
+        with open(CHECKPOINT_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+        return max(2, int(data.get("next_row", 2))), str(data.get("anchor_timestamp", ""))
+    except (OSError, ValueError, AttributeError):
+        return 2, ""
+
+
+def _save_checkpoint(next_row: int, anchor_timestamp: str) -> None:
+    tmp_path = CHECKPOINT_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"next_row": next_row, "anchor_timestamp": anchor_timestamp, "saved_at": time.time()}, f)
+    os.replace(tmp_path, CHECKPOINT_PATH)
+
+
+def _read_from_checkpoint(start_row: int, anchor: str) -> Tuple[Dict[str, List[str]], int, int, bool]:
+    # Returns (columns, start_row, api_calls, checkpoint_reset). Reading one row above the
+    # checkpoint validates it for free; past-the-grid reads come back empty from read_columns.
+    if start_row > 2:
+        columns = read_columns(PURGE_COLUMNS, start_row=start_row - 1)
+        head = columns["timestamp_utc"][0] if columns["timestamp_utc"] else ""
+        if anchor and head == anchor:
+            return {key: values[1:] for key, values in columns.items()}, start_row, 1, False
+        return read_columns(PURGE_COLUMNS, start_row=2), 2, 2, True
+    return read_columns(PURGE_COLUMNS, start_row=2), 2, 1, False
+
+
+def purge_emails(retention_days: int = RETENTION_DAYS, dry_run: bool = False) -> Dict[str, Any]:
+    """Blank emails older than the retention window, and any email whose owner chose do_not_contact"""
+    started = time.perf_counter()
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    start_row, anchor = _load_checkpoint()
+
+    columns, start_row, api_calls, checkpoint_reset = _read_from_checkpoint(start_row, anchor)
+    timestamps = columns["timestamp_utc"]
+    emails = columns["email"]
+    dnc = columns["do_not_contact"]
+    scanned = max(len(timestamps), len(emails), len(dnc))
+
+    to_blank: List[int] = []
+    unparsed = 0
+    # First row whose email has to be kept for now; the next run starts there
+    next_checkpoint = start_row + scanned
+    for i in range(scanned):
+        row = start_row + i
+        email = emails[i] if i < len(emails) else ""
+        if not email.strip():
+            continue
+        ts = _parse_timestamp(timestamps[i]) if i < len(timestamps) else None
+        if ts is None:
+            unparsed += 1
+        expired = ts is not None and ts < cutoff
+        opted_out = i < len(dnc) and _is_truthy(dnc[i])
+        if expired or opted_out:
+            to_blank.append(row)
+        elif next_checkpoint == start_row + scanned:
+            next_checkpoint = row
+
+    def anchor_for(next_row: int) -> str:
+        # timestamp_utc of the row just above next_row
+        i = next_row - 1 - start_row
+        if i < 0:
+            return anchor if next_row == start_row and not checkpoint_reset else ""
+        return timestamps[i] if i < len(timestamps) else ""
+
+    if not dry_run:
+        for offset in range(0, len(to_blank), CHUNK_ROWS):
+            chunk = to_blank[offset:offset + CHUNK_ROWS]
+            blank_column_cells("email", chunk)
+            api_calls += 1
+            # Resume point after this chunk, never past the first row still inside the window
+            resume_row = min(chunk[-1] + 1, next_checkpoint)
+            _save_checkpoint(resume_row, anchor_for(resume_row))
+        _save_checkpoint(next_checkpoint, anchor_for(next_checkpoint))
+
+    seconds = time.perf_counter() - started
+    return {
+        "dry_run": dry_run,
+        "start_row": start_row,
+        "checkpoint_reset": checkpoint_reset,
+        "rows_scanned": scanned,
+        "emails_blanked": len(to_blank),
+        "unparsed_timestamps": unparsed,
+        "next_checkpoint_row": next_checkpoint,
+        "api_calls": api_calls,
+        "seconds": round(seconds, 2),
+        "rows_per_second": round(scanned / seconds, 1) if seconds > 0 else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Blank expired or do_not_contact emails in the Responses sheet.")
+    parser.add_argument("--days", type=int, default=RETENTION_DAYS, help="retention window in days")
+    parser.add_argument("--dry-run", action="store_true", help="report what would be blanked without writing")
+    args = parser.parse_args()
+    print(json.dumps(purge_emails(args.days, args.dry_run), indent=2))
@@ -0,0 +1,181 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from collections import Counter, defaultdict
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+# Incremental analysis of free-text answers: term frequencies + MinHash/LSH near-duplicate clusters.
+# Only rows after the saved cursor are read, and the LSH index holds one signature per cluster,
+# so each run costs one batched read of the new rows and memory tracks clusters, not history.
+TEXT_FIELDS: List[str] = ["improve_one_thing", "current_problem"]
+STATE_PATH = os.environ.get("TEXT_ANALYSIS_PATH", ".text_analysis.json")
+
+NUM_PERM = 64
+BANDS = 16  # 16 bands x 4 rows -> candidate pairs from roughly 0.5 Jaccard
+ROWS_PER_BAND = NUM_PERM // BANDS
+SIMILARITY_THRESHOLD = 0.5
+SHINGLE_SIZE = 4
+EXAMPLES_PER_CLUSTER = 3
+MAX_TERMS = 5000
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(1234)  # fixed seed so signatures stay comparable across runs
+_PERMUTATIONS: List[Tuple[int, int]] = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_PERM)
+]
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by can could do for from get have i if in is it its me more "
+    "my no not of on or our so than that the their them there this to too us was we what "
+    "when which with would you your".split()
+)
+
+_lock = threading.Lock()
+
+
+def _normalize(text: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def _terms(normalized: str) -> List[str]:
+    words = [w for w in normalized.split() if len(w) > 2 and w not in STOPWORDS]
+    bigrams = [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return words + bigrams
+
+
+def minhash(normalized: str) -> List[int]:
+    if len(normalized) <= SHINGLE_SIZE:
+        shingles = {normalized}
+    else:
+        shingles = {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles]
+    return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def _similarity(sig_a: List[int], sig_b: List[int]) -> float:
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+
+def _band_keys(signature: List[int]) -> List[Tuple[int, Tuple[int, ...]]]:
+    return [
+        (band, tuple(signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]))
+        for band in range(BANDS)
+    ]
+
+
+class FieldAnalyzer:
+    """Running term counts and near-duplicate clusters for one text column"""
+
+    def __init__(self, state: Optional[Dict[str, Any]] = None):
+        state = state or {}
+        self.docs = state.get("docs", 0)
+        self.terms = Counter(state.get("terms", {}))
+        self.clusters: List[Dict[str, Any]] = state.get("clusters", [])
+        self._index: Dict[Tuple[int, Tuple[int, ...]], List[int]] = defaultdict(list)
+        for i, cluster in enumerate(self.clusters):
+            self._add_to_index(i, cluster["signature"])
+
+    def _add_to_index(self, cluster_id: int, signature: List[int]) -> None:
+        for key in _band_keys(signature):
+            self._index[key].append(cluster_id)
+
+    def add(self, text: str) -> None:
+        normalized = _normalize(text)
+        if not normalized:
+            return
+        self.docs += 1
+        self.terms.update(_terms(normalized))
+
+        signature = minhash(normalized)
+        candidates = {cid for key in _band_keys(signature) for cid in self._index.get(key, [])}
+        best_id, best_sim = None, SIMILARITY_THRESHOLD
+        for cid in candidates:
+            sim = _similarity(signature, self.clusters[cid]["signature"])
+            if sim >= best_sim:
+                best_id, best_sim = cid, sim
+
+        if best_id is None:
+            self.clusters.append({"signature": signature, "size": 1, "examples": [text.strip()]})
+            self._add_to_index(len(self.clusters) - 1, signature)
+        else:
+            cluster = self.clusters[best_id]
+            cluster["size"] += 1
+            if len(cluster["examples"]) < EXAMPLES_PER_CLUSTER:
+                cluster["examples"].append(text.strip())
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "docs": self.docs,
+            "terms": dict(self.terms.most_common(MAX_TERMS)),
+            "clusters": self.clusters,
+        }
+
+    def summary(self, top_terms: int = 20, top_clusters: int = 10) -> Dict[str, Any]:
+        clusters = sorted(self.clusters, key=lambda c: c["size"], reverse=True)[:top_clusters]
+        return {
+            "docs": self.docs,
+            "top_terms": self.terms.most_common(top_terms),
+            "clusters": [{"size": c["size"], "examples": c["examples"]} for c in clusters],
+        }
+
+
+def _load_state() -> Dict[str, Any]:
+    try:
+        with open(STATE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_state(state: Dict[str, Any]) -> None:
+    tmp_path = STATE_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, STATE_PATH)
+
+
+def update_analysis(read_columns: Callable[..., Dict[str, List[str]]]) -> Dict[str, Any]:
+    """Fold rows added since the last run into the cached analysis and return the summary"""
+    with _lock:
+        started = time.perf_counter()
+        state = _load_state()
+        next_row = state.get("next_row", 2)
+        analyzers = {f: FieldAnalyzer(state.get("fields", {}).get(f)) for f in TEXT_FIELDS}
+
+        columns = read_columns(TEXT_FIELDS, start_row=next_row)
+        new_rows = max((len(v) for v in columns.values()), default=0)
+        for field, values in columns.items():
+            for text in values:
+                analyzers[field].add(text)
+
+        # Rows are append-only, so a row cursor is enough to skip history
+        state = {
+            "next_row": next_row + new_rows,
+            "fields": {f: a.to_state() for f, a in analyzers.items()},
+            "updated_at": time.time(),
+        }
+        _save_state(state)
+        return {
+            "new_rows": new_rows,
+            "seconds": round(time.perf_counter() - started, 2),
+            "fields": {f: a.summary() for f, a in analyzers.items()},
+        }
+
+
+def cached_summary() -> Dict[str, Any]:
+    """Summary from the saved state only; no sheet reads"""
+    state = _load_state()
+    return {
+        "updated_at": state.get("updated_at"),
+        "fields": {f: FieldAnalyzer(state.get("fields", {}).get(f)).summary() for f in TEXT_FIELDS},
+    }
+
+
+if __name__ == "__main__":
+    from utils.g_sheets import read_columns
+
+    print(json.dumps(update_analysis(read_columns), indent=2, ensure_ascii=False))